@@ -9,6 +9,10 @@ from src.models.user import db
 from src.routes.user import user_bp
 from src.routes.products import products_bp
 from src.routes.admin import admin_bp
+from src.services.jobs import job_queue
+from src.services.catalog_snapshot import catalog_cache
+from src.services.profiler import request_profiler
+from src.services.order_archive import ensure_order_ids_not_reused
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -26,9 +30,25 @@ app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirnam
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
+# Background job queue (set JOB_QUEUE_WORKERS to 0 to disable the workers)
+app.config['JOB_QUEUE_WORKERS'] = int(os.environ.get('JOB_QUEUE_WORKERS', 2))
+
+# Completed/cancelled orders older than this are moved to the archive table
+app.config['ORDER_ARCHIVE_AFTER_DAYS'] = int(os.environ.get('ORDER_ARCHIVE_AFTER_DAYS', 90))
+# How often archival runs in the background, in seconds (0 disables it)
+app.config['ORDER_ARCHIVE_INTERVAL'] = int(os.environ.get('ORDER_ARCHIVE_INTERVAL', 24 * 60 * 60))
+
+# Serve storefront product reads from an in-memory snapshot
+app.config['CATALOG_SNAPSHOT_ENABLED'] = os.environ.get('CATALOG_SNAPSHOT_ENABLED', '').lower() in ('1', 'true', 'yes')
+
+# Request profiling: admins can send an X-Profile header, or sample a fraction of traffic
+app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+request_profiler.init_app(app)
+
 # Initialize database and create default admin
 with app.app_context():
     db.create_all()
+    ensure_order_ids_not_reused()
     
     # Import models after app context is created
     from src.models.product import Product, Order, Admin
@@ -45,6 +65,18 @@ with app.app_context():
         db.session.commit()
         print("Default admin created: username=admin, password=denima2024")
 
+# Start job workers and load the catalog snapshot once the tables exist
+job_queue.init_app(app)
+catalog_cache.init_app(app)
+
+if app.config['ORDER_ARCHIVE_INTERVAL'] > 0:
+    job_queue.schedule('orders.archive', app.config['ORDER_ARCHIVE_INTERVAL'])
+
+# Under the debug reloader the parent process only watches files; the workers
+# belong in the child that serves requests (WERKZEUG_RUN_MAIN is set there)
+if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not (app.debug or __name__ == '__main__'):
+    job_queue.start()
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
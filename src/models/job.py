@@ -0,0 +1,39 @@
+from src.models.user import db
+from datetime import datetime
+import json
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # order.created, order.status_changed, ...
+    payload = db.Column(db.Text)  # JSON string for handler arguments
+    idempotency_key = db.Column(db.String(200), unique=True)
+    status = db.Column(db.String(20), default='queued', index=True)  # queued, running, done, failed
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=5)
+    last_error = db.Column(db.Text)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    lease_expires_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} ({self.status})>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'payload': json.loads(self.payload) if self.payload else {},
+            'idempotency_key': self.idempotency_key,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'last_error': self.last_error,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
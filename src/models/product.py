@@ -57,8 +57,20 @@ class Product(db.Model):
         product.is_active = data.get('is_active', True)
         return product
 
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CatalogVersion {self.version}>'
+
 class Order(db.Model):
     __tablename__ = 'orders'
+    # Ids of archived orders must never be reused for new orders
+    __table_args__ = {'sqlite_autoincrement': True}
     
     id = db.Column(db.Integer, primary_key=True)
     customer_name = db.Column(db.String(100), nullable=False)
@@ -94,6 +106,47 @@ class Order(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class ArchivedOrder(db.Model):
+    __tablename__ = 'orders_archive'
+    
+    # Keeps the original order id so references to archived orders stay valid
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    customer_name = db.Column(db.String(100), nullable=False)
+    customer_email = db.Column(db.String(100), nullable=False)
+    customer_phone = db.Column(db.String(20))
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    quantity = db.Column(db.Integer, default=1)
+    total_price = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20))  # completed, cancelled
+    notes = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationship
+    product = db.relationship('Product')
+    
+    def __repr__(self):
+        return f'<ArchivedOrder {self.id} - {self.customer_name}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'customer_name': self.customer_name,
+            'customer_email': self.customer_email,
+            'customer_phone': self.customer_phone,
+            'product_id': self.product_id,
+            'product_name': self.product.name if self.product else None,
+            'quantity': self.quantity,
+            'total_price': self.total_price,
+            'status': self.status,
+            'notes': self.notes,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'archived': True,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
 class Admin(db.Model):
     __tablename__ = 'admins'
     
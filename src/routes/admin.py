@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify, session
 from src.models.product import db, Admin
+from src.services.jobs import job_queue
+from src.services import order_archive  # registers the orders.archive job handler
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import functools
@@ -121,7 +123,8 @@ def create_admin():
 def get_dashboard_stats():
     """Get dashboard statistics"""
     try:
-        from src.models.product import Product, Order
+        from src.models.product import Product, Order, ArchivedOrder
+        include_archived = request.args.get('include_archived') == 'true'
         
         # Get statistics
         total_products = Product.query.count()
@@ -129,6 +132,10 @@ def get_dashboard_stats():
         pending_orders = Order.query.filter_by(status='pending').count()
         completed_orders = Order.query.filter_by(status='completed').count()
         
+        if include_archived:
+            total_orders += ArchivedOrder.query.count()
+            completed_orders += ArchivedOrder.query.filter_by(status='completed').count()
+        
         # Get recent orders
         recent_orders = Order.query.order_by(Order.created_at.desc()).limit(5).all()
         
@@ -207,10 +214,13 @@ def get_total_users():
 def get_total_revenue():
     """Get total revenue from completed orders"""
     try:
-        from src.models.order import Order
+        from src.models.product import Order, ArchivedOrder
         total_revenue = db.session.query(db.func.sum(Order.total_price)).filter_by(status='completed').scalar()
         if total_revenue is None:
             total_revenue = 0
+        if request.args.get("include_archived") == "true":
+            archived_revenue = db.session.query(db.func.sum(ArchivedOrder.total_price)).filter_by(status='completed').scalar()
+            total_revenue = float(total_revenue) + float(archived_revenue or 0)
         return jsonify({
             "success": True,
             "total_revenue": float(total_revenue)
@@ -218,4 +228,57 @@ def get_total_revenue():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@admin_bp.route("/admin/jobs/metrics", methods=["GET"])
+@admin_required
+def get_job_metrics():
+    """Get background job queue depth and latency metrics"""
+    try:
+        return jsonify({
+            "success": True,
+            "metrics": job_queue.metrics()
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
 
+@admin_bp.route("/admin/jobs", methods=["GET"])
+@admin_required
+def get_jobs():
+    """Get recent background jobs, optionally filtered by status"""
+    try:
+        from src.models.job import Job
+        status = request.args.get("status")
+        query = Job.query
+        if status:
+            query = query.filter_by(status=status)
+        jobs = query.order_by(Job.created_at.desc()).limit(100).all()
+        return jsonify({
+            "success": True,
+            "jobs": [job.to_dict() for job in jobs]
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@admin_bp.route("/admin/orders/archive", methods=["POST"])
+@admin_required
+def archive_old_orders():
+    """Queue archival of old completed and cancelled orders"""
+    try:
+        data = request.get_json(silent=True) or {}
+        payload = {}
+        for field in ("older_than_days", "batch_size"):
+            value = data.get(field)
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value <= 0):
+                return jsonify({"success": False, "error": f"{field} must be a positive integer"}), 400
+            payload[field] = value
+        
+        job = job_queue.enqueue("orders.archive", payload)
+        db.session.commit()
+        job_queue.notify()
+        return jsonify({
+            "success": True,
+            "message": "Order archival queued",
+            "job": job.to_dict()
+        }), 202
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
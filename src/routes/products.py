@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
-from src.models.product import db, Product, Order
+from src.models.product import db, Product, Order, ArchivedOrder
+from src.services.jobs import job_queue
+from src.services.catalog_snapshot import catalog_cache
+from src.services.order_events import enqueue_order_created, enqueue_order_status_changed
 from datetime import datetime
 import json
 import os
@@ -59,6 +62,10 @@ def get_products():
         platform = request.args.get('platform')
         popular_only = request.args.get('popular') == 'true'
         
+        cached = catalog_cache.product_list_response(category, platform, popular_only)
+        if cached is not None:
+            return cached
+        
         query = Product.query.filter_by(is_active=True)
         
         if category:
@@ -89,6 +96,10 @@ def get_products():
 def get_product(product_id):
     """Get a specific product by ID"""
     try:
+        cached = catalog_cache.product_response(product_id)
+        if cached is not None:
+            return cached
+        
         product = Product.query.get_or_404(product_id)
         return jsonify({
             'success': True,
@@ -111,7 +122,9 @@ def create_product():
         
         product = Product.from_dict(data)
         db.session.add(product)
+        catalog_cache.bump_version()
         db.session.commit()
+        catalog_cache.refresh()
         
         return jsonify({
             'success': True,
@@ -152,7 +165,9 @@ def update_product(product_id):
             product.is_active = data['is_active']
         
         product.updated_at = datetime.utcnow()
+        catalog_cache.bump_version()
         db.session.commit()
+        catalog_cache.refresh()
         
         return jsonify({
             'success': True,
@@ -172,7 +187,9 @@ def delete_product(product_id):
         # Soft delete - just mark as inactive
         product.is_active = False
         product.updated_at = datetime.utcnow()
+        catalog_cache.bump_version()
         db.session.commit()
+        catalog_cache.refresh()
         
         return jsonify({
             'success': True,
@@ -210,7 +227,10 @@ def create_order():
         )
         
         db.session.add(order)
+        db.session.flush()
+        enqueue_order_created(order)
         db.session.commit()
+        job_queue.notify()
         
         return jsonify({
             'success': True,
@@ -226,6 +246,7 @@ def get_orders():
     """Get all orders (Admin only)"""
     try:
         status = request.args.get('status')
+        include_archived = request.args.get('include_archived') == 'true'
         
         query = Order.query
         if status:
@@ -233,6 +254,14 @@ def get_orders():
         
         orders = query.order_by(Order.created_at.desc()).all()
         
+        # Archived orders are only read when explicitly requested
+        if include_archived:
+            archived_query = ArchivedOrder.query
+            if status:
+                archived_query = archived_query.filter_by(status=status)
+            orders = sorted(orders + archived_query.all(),
+                            key=lambda order: order.created_at or datetime.min, reverse=True)
+        
         return jsonify({
             'success': True,
             'orders': [order.to_dict() for order in orders]
@@ -246,6 +275,7 @@ def update_order_status(order_id):
     try:
         order = Order.query.get_or_404(order_id)
         data = request.get_json()
+        old_status = order.status
         
         if 'status' in data:
             order.status = data['status']
@@ -253,7 +283,12 @@ def update_order_status(order_id):
             order.notes = data['notes']
         
         order.updated_at = datetime.utcnow()
+        status_changed = order.status != old_status
+        if status_changed:
+            enqueue_order_status_changed(order, old_status)
         db.session.commit()
+        if status_changed:
+            job_queue.notify()
         
         return jsonify({
             'success': True,
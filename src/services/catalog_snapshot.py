@@ -0,0 +1,156 @@
+"""Optional in-memory catalog snapshot for storefront reads.
+
+When ``CATALOG_SNAPSHOT_ENABLED`` is set, the whole catalog is loaded once
+into an immutable snapshot holding pre-encoded JSON responses for every
+category / platform / popularity bucket and for every product id.
+``get_products`` and ``get_product`` are then answered from memory.
+
+Product writes bump a shared version counter in the ``catalog_version``
+table. Each process compares its snapshot version against that counter at
+most once per ``CATALOG_SNAPSHOT_CHECK_INTERVAL`` seconds and rebuilds when
+another worker has changed the catalog.
+"""
+from src.models.product import db, Product, CatalogVersion
+from types import MappingProxyType
+from flask import Response
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class CatalogSnapshot:
+    """Immutable view of the catalog with pre-encoded response bodies"""
+
+    __slots__ = ('version', 'lists', 'products', 'empty_list')
+
+    def __init__(self, version, lists, products, empty_list):
+        self.version = version
+        self.lists = lists
+        self.products = products
+        self.empty_list = empty_list
+
+class CatalogCache:
+    """Builds, serves and invalidates the catalog snapshot"""
+
+    def __init__(self, app=None):
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CATALOG_SNAPSHOT_ENABLED', False)
+        app.config.setdefault('CATALOG_SNAPSHOT_CHECK_INTERVAL', 1.0)
+        self.app = app
+        app.extensions['catalog_cache'] = self
+
+        with app.app_context():
+            if db.session.get(CatalogVersion, 1) is None:
+                db.session.add(CatalogVersion(id=1, version=0))
+                db.session.commit()
+            if self.enabled:
+                self.refresh()
+
+    @property
+    def enabled(self):
+        return self.app is not None and self.app.config['CATALOG_SNAPSHOT_ENABLED']
+
+    def bump_version(self):
+        """Increment the shared version in the caller's transaction"""
+        updated = CatalogVersion.query.filter_by(id=1).update(
+            {'version': CatalogVersion.version + 1}, synchronize_session=False)
+        if not updated:
+            db.session.add(CatalogVersion(id=1, version=1))
+
+    def refresh(self):
+        """Rebuild the snapshot from the database (after a committed write)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                self._snapshot = self._build()
+            except Exception:
+                # Keep serving from SQLite rather than failing requests
+                self._snapshot = None
+                logger.exception('Failed to build catalog snapshot')
+            self._last_check = time.monotonic()
+
+    def product_list_response(self, category, platform, popular_only):
+        """Pre-encoded response for get_products, or None to fall back to SQLite"""
+        snapshot = self._current()
+        if snapshot is None:
+            return None
+        if platform and platform.lower() == 'all':
+            platform = None
+        body = snapshot.lists.get((category or None, platform or None, popular_only), snapshot.empty_list)
+        return self._response(body)
+
+    def product_response(self, product_id):
+        """Pre-encoded response for get_product, or None to fall back to SQLite"""
+        snapshot = self._current()
+        if snapshot is None:
+            return None
+        body = snapshot.products.get(product_id)
+        if body is None:
+            return None
+        return self._response(body)
+
+    def _current(self):
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        if now - self._last_check >= self.app.config['CATALOG_SNAPSHOT_CHECK_INTERVAL']:
+            self._last_check = now
+            try:
+                version = db.session.query(CatalogVersion.version).filter_by(id=1).scalar()
+            except Exception:
+                logger.exception('Failed to read catalog version')
+                return None
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                self.refresh()
+        return self._snapshot
+
+    def _build(self):
+        version = db.session.query(CatalogVersion.version).filter_by(id=1).scalar() or 0
+        products = Product.query.order_by(Product.id).all()
+        encoded = {}
+        active = []
+        for product in products:
+            data = product.to_dict()
+            encoded[product.id] = self._encode({'success': True, 'product': data})
+            if product.is_active:
+                active.append((product, data))
+
+        categories = {product.category for product, _ in active}
+        platforms = {p for _, data in active for p in data['platforms']}
+
+        lists = {}
+        for category in [None, *categories]:
+            for platform in [None, *platforms]:
+                for popular_only in (False, True):
+                    bucket = [
+                        data for product, data in active
+                        if (category is None or product.category == category)
+                        and (platform is None or platform in data['platforms'])
+                        and (not popular_only or product.is_popular)
+                    ]
+                    lists[(category, platform, popular_only)] = self._encode({'success': True, 'products': bucket})
+
+        return CatalogSnapshot(
+            version=version,
+            lists=MappingProxyType(lists),
+            products=MappingProxyType(encoded),
+            empty_list=self._encode({'success': True, 'products': []})
+        )
+
+    def _encode(self, obj):
+        return (self.app.json.dumps(obj) + '\n').encode('utf-8')
+
+    def _response(self, body):
+        return Response(body, mimetype=self.app.json.mimetype)
+
+catalog_cache = CatalogCache()
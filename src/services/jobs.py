@@ -0,0 +1,283 @@
+"""Lightweight in-process job queue persisted in SQLite.
+
+Jobs are rows in the ``jobs`` table. Routes enqueue them inside their own
+transaction, so a job exists if and only if the write that triggered it was
+committed. A small pool of worker threads claims queued jobs, runs the
+registered handler and retries failures with exponential backoff.
+
+Once per lease period one worker also runs maintenance: jobs whose
+worker died are requeued (or failed once out of attempts), and finished jobs
+older than ``JOB_QUEUE_RETENTION_DAYS`` are deleted. Deleting a job frees its
+idempotency key, so keys must identify events that cannot recur. The same
+pass enqueues jobs registered with ``schedule()`` once per interval.
+"""
+from src.models.user import db
+from src.models.job import Job
+from datetime import datetime, timedelta
+from collections import deque
+from sqlalchemy.exc import IntegrityError
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class JobQueue:
+    """SQLite-backed job queue with a worker thread pool"""
+
+    def __init__(self, app=None):
+        self._handlers = {}
+        self._threads = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._metrics_lock = threading.Lock()
+        self._wait_times = deque(maxlen=500)
+        self._run_times = deque(maxlen=500)
+        self._counters = {'succeeded': 0, 'retried': 0, 'failed': 0}
+        self._maintenance_lock = threading.Lock()
+        self._next_maintenance = 0.0
+        self._schedules = []
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read configuration; call ``start()`` in the process that serves requests"""
+        app.config.setdefault('JOB_QUEUE_WORKERS', 2)
+        app.config.setdefault('JOB_QUEUE_MAX_ATTEMPTS', 5)
+        app.config.setdefault('JOB_QUEUE_BACKOFF_SECONDS', 2.0)
+        app.config.setdefault('JOB_QUEUE_POLL_INTERVAL', 1.0)
+        app.config.setdefault('JOB_QUEUE_LEASE_SECONDS', 300)
+        app.config.setdefault('JOB_QUEUE_RETENTION_DAYS', 7)
+        self.app = app
+        app.extensions['job_queue'] = self
+
+        # create_all() does not add indexes to a jobs table that already exists
+        with app.app_context():
+            for index in Job.__table__.indexes:
+                index.create(db.engine, checkfirst=True)
+
+    def handler(self, kind):
+        """Decorator registering the handler for a job kind"""
+        def decorator(f):
+            self._handlers[kind] = f
+            return f
+        return decorator
+
+    def enqueue(self, kind, payload=None, idempotency_key=None, max_attempts=None):
+        """Add a job to the current session without committing it.
+
+        The caller commits together with its own changes and then calls
+        ``notify()``. If a job with the same idempotency key already exists,
+        that job is returned instead of creating a new one.
+        """
+        if idempotency_key:
+            existing = Job.query.filter_by(idempotency_key=idempotency_key).first()
+            if existing:
+                return existing
+
+        now = datetime.utcnow()
+        job = Job(
+            kind=kind,
+            payload=json.dumps(payload or {}),
+            idempotency_key=idempotency_key,
+            status='queued',
+            attempts=0,
+            max_attempts=max_attempts or self.app.config['JOB_QUEUE_MAX_ATTEMPTS'],
+            run_after=now,
+            created_at=now
+        )
+        db.session.add(job)
+        return job
+
+    def schedule(self, kind, interval, payload=None):
+        """Enqueue a job of ``kind`` once every ``interval`` seconds.
+
+        Runs from the maintenance pass, so the effective resolution is
+        ``JOB_QUEUE_LEASE_SECONDS``. Each interval gets its own idempotency
+        key, so several processes enqueue it only once.
+        """
+        self._schedules.append((kind, interval, payload or {}))
+
+    def notify(self):
+        """Wake up idle workers after new jobs have been committed"""
+        self._wakeup.set()
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.app.config['JOB_QUEUE_WORKERS']):
+            thread = threading.Thread(target=self._worker_loop, name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _worker_loop(self):
+        poll_interval = self.app.config['JOB_QUEUE_POLL_INTERVAL']
+        while not self._stop.is_set():
+            ran_job = False
+            try:
+                with self.app.app_context():
+                    self._maybe_run_maintenance()
+                    job = self._claim_next()
+                    if job is not None:
+                        self._run(job)
+                        ran_job = True
+            except Exception:
+                logger.exception('Job worker iteration failed')
+
+            if not ran_job:
+                self._wakeup.wait(poll_interval)
+                self._wakeup.clear()
+
+    def _claim_next(self):
+        """Atomically move the next due job from queued to running"""
+        now = datetime.utcnow()
+        lease = timedelta(seconds=self.app.config['JOB_QUEUE_LEASE_SECONDS'])
+
+        candidate = (Job.query
+                     .with_entities(Job.id)
+                     .filter(Job.status == 'queued', Job.run_after <= now)
+                     .order_by(Job.run_after, Job.id)
+                     .first())
+        if candidate is None:
+            return None
+
+        claimed = Job.query.filter_by(id=candidate.id, status='queued').update({
+            'status': 'running',
+            'attempts': Job.attempts + 1,
+            'started_at': now,
+            'lease_expires_at': now + lease
+        }, synchronize_session=False)
+        db.session.commit()
+        if claimed != 1:
+            # Another worker got there first
+            return None
+        return db.session.get(Job, candidate.id)
+
+    def _maybe_run_maintenance(self):
+        """Run maintenance at most once per lease period in this process"""
+        lease_seconds = self.app.config['JOB_QUEUE_LEASE_SECONDS']
+        with self._maintenance_lock:
+            if time.monotonic() < self._next_maintenance:
+                return
+            self._next_maintenance = time.monotonic() + lease_seconds
+        self.run_maintenance()
+
+    def run_maintenance(self):
+        """Recover jobs with expired leases and delete old finished jobs"""
+        now = datetime.utcnow()
+        retention = timedelta(days=self.app.config['JOB_QUEUE_RETENTION_DAYS'])
+        expired = Job.query.filter(Job.status == 'running', Job.lease_expires_at < now)
+
+        # The worker died or overran its lease: retry unless out of attempts
+        failed = expired.filter(Job.attempts >= Job.max_attempts).update({
+            'status': 'failed',
+            'last_error': 'Lease expired before the job finished',
+            'lease_expires_at': None,
+            'finished_at': now
+        }, synchronize_session=False)
+        requeued = expired.filter(Job.attempts < Job.max_attempts).update({
+            'status': 'queued',
+            'lease_expires_at': None,
+            'run_after': now
+        }, synchronize_session=False)
+        deleted = Job.query.filter(
+            Job.status.in_(('done', 'failed')),
+            Job.finished_at < now - retention
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+        if failed or requeued or deleted:
+            logger.info('Job maintenance: %d requeued, %d failed, %d deleted', requeued, failed, deleted)
+
+        for kind, interval, payload in self._schedules:
+            slot = int(time.time() // interval)
+            try:
+                self.enqueue(kind, payload, idempotency_key=f'schedule:{kind}:{slot}')
+                db.session.commit()
+            except IntegrityError:
+                # Another process enqueued this interval first
+                db.session.rollback()
+        if self._schedules:
+            self.notify()
+
+    def _run(self, job):
+        handler = self._handlers.get(job.kind)
+        enqueued_at = job.run_after if job.attempts > 1 else job.created_at
+        wait_time = (job.started_at - enqueued_at).total_seconds()
+        started = time.monotonic()
+        try:
+            if handler is None:
+                raise LookupError(f'No handler registered for job kind: {job.kind}')
+            handler(json.loads(job.payload) if job.payload else {})
+        except Exception as e:
+            db.session.rollback()
+            now = datetime.utcnow()
+            job.last_error = str(e)
+            job.lease_expires_at = None
+            if job.attempts >= job.max_attempts:
+                job.status = 'failed'
+                job.finished_at = now
+                outcome = 'failed'
+                logger.error('Job %s (%s) failed permanently: %s', job.id, job.kind, e)
+            else:
+                backoff = self.app.config['JOB_QUEUE_BACKOFF_SECONDS'] * 2 ** (job.attempts - 1)
+                job.status = 'queued'
+                job.run_after = now + timedelta(seconds=backoff)
+                outcome = 'retried'
+                logger.warning('Job %s (%s) failed, retrying in %.1fs: %s', job.id, job.kind, backoff, e)
+        else:
+            job.status = 'done'
+            job.last_error = None
+            job.lease_expires_at = None
+            job.finished_at = datetime.utcnow()
+            outcome = 'succeeded'
+        db.session.commit()
+        self._record(outcome, wait_time, time.monotonic() - started)
+
+    def _record(self, outcome, wait_time, run_time):
+        with self._metrics_lock:
+            self._counters[outcome] += 1
+            self._wait_times.append(wait_time)
+            self._run_times.append(run_time)
+
+    def metrics(self):
+        """Queue depth from the database plus latency of recently run jobs"""
+        depth = dict(db.session.query(Job.status, db.func.count(Job.id)).group_by(Job.status).all())
+        oldest_queued = db.session.query(db.func.min(Job.created_at)).filter(Job.status == 'queued').scalar()
+
+        with self._metrics_lock:
+            counters = dict(self._counters)
+            wait_times = list(self._wait_times)
+            run_times = list(self._run_times)
+
+        return {
+            'workers': len(self._threads),
+            'depth': {status: depth.get(status, 0) for status in ('queued', 'running', 'done', 'failed')},
+            'oldest_queued_age_seconds': (datetime.utcnow() - oldest_queued).total_seconds() if oldest_queued else 0,
+            'processed': counters,
+            'wait_seconds': _summarize(wait_times),
+            'run_seconds': _summarize(run_times)
+        }
+
+def _summarize(samples):
+    if not samples:
+        return {'count': 0, 'avg': 0, 'p95': 0, 'max': 0}
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'avg': sum(ordered) / len(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1]
+    }
+
+job_queue = JobQueue()
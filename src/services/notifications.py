@@ -0,0 +1,32 @@
+"""Local stand-in for the notification sink.
+
+Messages are logged and kept in memory instead of being delivered, so the
+job pipeline can run end to end without an email provider.
+"""
+from collections import deque
+from datetime import datetime
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_sent = deque(maxlen=100)
+_sent_lock = threading.Lock()
+
+def send_notification(recipient, subject, body):
+    """Record a notification as if it had been delivered"""
+    message = {
+        'recipient': recipient,
+        'subject': subject,
+        'body': body,
+        'sent_at': datetime.utcnow().isoformat()
+    }
+    with _sent_lock:
+        _sent.append(message)
+    logger.info('Notification to %s: %s', recipient, subject)
+    return message
+
+def recent_notifications():
+    """Most recent stub deliveries, newest last"""
+    with _sent_lock:
+        return list(_sent)
@@ -0,0 +1,102 @@
+"""Archival of old completed and cancelled orders.
+
+Finished orders older than ``ORDER_ARCHIVE_AFTER_DAYS`` are moved from
+``orders`` into ``orders_archive`` in batches of ``ORDER_ARCHIVE_BATCH_SIZE``,
+one transaction per batch, so the live table only holds recent and open
+orders. Archival runs as an ``orders.archive`` job every
+``ORDER_ARCHIVE_INTERVAL`` seconds, and admins can also queue it by hand. Order endpoints read the archive only when asked to.
+"""
+from src.models.product import db, Order, ArchivedOrder
+from src.services.jobs import job_queue
+from flask import current_app
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_STATUSES = ('completed', 'cancelled')
+
+_COPIED_COLUMNS = (
+    'id', 'customer_name', 'customer_email', 'customer_phone', 'product_id',
+    'quantity', 'total_price', 'status', 'notes', 'created_at', 'updated_at'
+)
+
+def archive_orders(older_than_days=None, batch_size=None):
+    """Move finished orders older than the cutoff into the archive table.
+
+    Returns the number of orders archived.
+    """
+    if older_than_days is None:
+        older_than_days = current_app.config.get('ORDER_ARCHIVE_AFTER_DAYS', 90)
+    if batch_size is None:
+        batch_size = current_app.config.get('ORDER_ARCHIVE_BATCH_SIZE', 500)
+
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    last_activity = db.func.coalesce(Order.updated_at, Order.created_at)
+    archivable = db.and_(Order.status.in_(ARCHIVABLE_STATUSES), last_activity < cutoff)
+    total = 0
+
+    while True:
+        ids = [row.id for row in db.session.query(Order.id)
+               .filter(archivable)
+               .order_by(Order.id)
+               .limit(batch_size)]
+        if not ids:
+            break
+
+        # Re-check the filter in the write statements: an order may have been
+        # reopened since the ids were read
+        batch = db.and_(Order.id.in_(ids), archivable)
+        try:
+            archived_at = db.literal(datetime.utcnow(), db.DateTime)
+            source = db.select(*[getattr(Order, name) for name in _COPIED_COLUMNS], archived_at).where(batch)
+            db.session.execute(
+                db.insert(ArchivedOrder).from_select([*_COPIED_COLUMNS, 'archived_at'], source))
+            archived = Order.query.filter(batch).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        total += archived
+        logger.info('Archived %d orders (%d so far)', archived, total)
+
+    return total
+
+def ensure_order_ids_not_reused():
+    """Make sure archived order ids are never handed out again.
+
+    ``orders`` used to be created without AUTOINCREMENT, so SQLite reused the
+    highest id once that order was archived. Older tables are rebuilt with
+    AUTOINCREMENT, and the id sequence is moved past the highest archived id.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    with db.engine.connect() as conn:
+        # pysqlite runs DDL outside transactions unless one is opened explicitly
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+        table_sql = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'orders'").scalar()
+        if table_sql and 'AUTOINCREMENT' not in table_sql.upper():
+            old_columns = {row[1] for row in conn.exec_driver_sql('PRAGMA table_info(orders)')}
+            columns = ', '.join(c.name for c in Order.__table__.columns if c.name in old_columns)
+            conn.exec_driver_sql('ALTER TABLE orders RENAME TO orders_old')
+            Order.__table__.create(conn)
+            conn.exec_driver_sql(f'INSERT INTO orders ({columns}) SELECT {columns} FROM orders_old')
+            conn.exec_driver_sql('DROP TABLE orders_old')
+            logger.info('Rebuilt orders table with AUTOINCREMENT ids')
+
+        highest = conn.exec_driver_sql(
+            'SELECT MAX(id) FROM (SELECT id FROM orders UNION ALL SELECT id FROM orders_archive)').scalar()
+        if highest:
+            seq = conn.exec_driver_sql("SELECT seq FROM sqlite_sequence WHERE name = 'orders'").scalar()
+            if seq is None:
+                conn.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES ('orders', ?)", (highest,))
+            elif seq < highest:
+                conn.exec_driver_sql("UPDATE sqlite_sequence SET seq = ? WHERE name = 'orders'", (highest,))
+        conn.commit()
+
+@job_queue.handler('orders.archive')
+def handle_archive_orders(payload):
+    archive_orders(payload.get('older_than_days'), payload.get('batch_size'))
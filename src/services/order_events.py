@@ -0,0 +1,44 @@
+"""Background work triggered by order creation and status changes."""
+from src.models.product import db, Order
+from src.services.jobs import job_queue
+from src.services.notifications import send_notification
+
+def enqueue_order_created(order):
+    """Queue follow-up work for a new order (call before committing)"""
+    return job_queue.enqueue(
+        'order.created',
+        {'order_id': order.id},
+        idempotency_key=f'order:{order.id}:created'
+    )
+
+def enqueue_order_status_changed(order, old_status):
+    """Queue follow-up work for a status transition (call before committing)"""
+    return job_queue.enqueue(
+        'order.status_changed',
+        {'order_id': order.id, 'old_status': old_status, 'new_status': order.status},
+        idempotency_key=f'order:{order.id}:status:{order.status}:{order.updated_at.isoformat()}'
+    )
+
+@job_queue.handler('order.created')
+def handle_order_created(payload):
+    order = db.session.get(Order, payload['order_id'])
+    if not order:
+        return
+    send_notification(
+        order.customer_email,
+        f'Order #{order.id} received',
+        f'Hi {order.customer_name}, we received your order for '
+        f'{order.product.name if order.product else "your product"} ({order.total_price}).'
+    )
+
+@job_queue.handler('order.status_changed')
+def handle_order_status_changed(payload):
+    order = db.session.get(Order, payload['order_id'])
+    if not order:
+        return
+    send_notification(
+        order.customer_email,
+        f'Order #{order.id} is now {payload["new_status"]}',
+        f'Hi {order.customer_name}, your order status changed from '
+        f'{payload["old_status"]} to {payload["new_status"]}.'
+    )
@@ -0,0 +1,214 @@
+"""Opt-in sampling profiler for individual requests.
+
+A request is profiled when a logged-in admin sends the ``X-Profile`` header,
+or when it is picked by ``PROFILE_SAMPLE_RATE`` (a fraction between 0 and 1,
+optionally limited to the endpoints in ``PROFILE_ENDPOINTS``). While the
+request runs, a helper thread samples the request thread's stack every
+``PROFILE_INTERVAL`` seconds. A request that finishes before the first
+sample has nothing to report, and no output is written for it.
+
+Output goes to ``PROFILE_OUTPUT_DIR`` in collapsed-stack format
+(``frame;frame;frame count``), which flamegraph.pl and speedscope read
+directly. Header-triggered requests get a file each, named in the
+``X-Profile-Output`` response header. Sampled traffic is
+merged into one file per endpoint and process, flushed at most every
+``PROFILE_FLUSH_INTERVAL`` seconds. Each endpoint keeps at most
+``PROFILE_MAX_STACKS`` distinct stacks, and only the newest
+``PROFILE_MAX_FILES`` files are kept on disk.
+
+Unprofiled requests only pay for a header lookup and a config check.
+"""
+from flask import g, request, session
+from collections import Counter
+from datetime import datetime
+import atexit
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+OVERFLOW_STACK = '[other stacks]'
+
+class StackSampler(threading.Thread):
+    """Periodically records the stack of one thread"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if self._stop_event.is_set():
+                # The request thread is already inside stop(); not its work
+                break
+            self._record(frame)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def _record(self, frame):
+        if frame is None:
+            return
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        self.samples[';'.join(reversed(stack))] += 1
+
+def _frame_label(frame):
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}:{frame.f_code.co_name}'
+
+def _collapsed(samples):
+    return ''.join(f'{stack} {count}\n' for stack, count in samples.most_common())
+
+class RequestProfiler:
+    """Flask hooks that start and stop a sampler around selected requests"""
+
+    def __init__(self, app=None):
+        self._aggregates = {}
+        self._last_flush = {}
+        self._lock = threading.Lock()
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+        app.config.setdefault('PROFILE_ENDPOINTS', [])
+        app.config.setdefault('PROFILE_INTERVAL', 0.001)
+        app.config.setdefault('PROFILE_OUTPUT_DIR', os.path.join(app.root_path, 'profiles'))
+        app.config.setdefault('PROFILE_FLUSH_INTERVAL', 10.0)
+        app.config.setdefault('PROFILE_MAX_STACKS', 2000)
+        app.config.setdefault('PROFILE_MAX_FILES', 100)
+        self.app = app
+        app.extensions['request_profiler'] = self
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        atexit.register(self.flush)
+
+    def _should_profile(self):
+        if PROFILE_HEADER in request.headers:
+            return 'admin_id' in session
+        rate = self.app.config['PROFILE_SAMPLE_RATE']
+        if rate <= 0:
+            return False
+        endpoints = self.app.config['PROFILE_ENDPOINTS']
+        if endpoints and request.endpoint not in endpoints:
+            return False
+        return random.random() < rate
+
+    def _before_request(self):
+        if not self._should_profile():
+            return
+        sampler = StackSampler(threading.get_ident(), self.app.config['PROFILE_INTERVAL'])
+        sampler.start()
+        g.profile_sampler = sampler
+
+    def _after_request(self, response):
+        sampler = g.pop('profile_sampler', None)
+        if sampler is None:
+            return response
+        sampler.stop()
+        try:
+            if PROFILE_HEADER in request.headers:
+                # Only reachable for admins, see _should_profile()
+                filename = self._write_request(sampler.samples)
+                if filename:
+                    response.headers['X-Profile-Output'] = filename
+            else:
+                self._aggregate(sampler.samples)
+        except Exception:
+            logger.exception('Failed to write request profile')
+        return response
+
+    def _teardown_request(self, exc):
+        # after_request is skipped when the view raises; don't leak the sampler
+        sampler = g.pop('profile_sampler', None)
+        if sampler is not None:
+            sampler.stop()
+
+    def _write_request(self, samples):
+        """Write the profile of one header-triggered request to its own file"""
+        if not samples:
+            return None
+        endpoint = request.endpoint or 'unknown'
+        timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        filename = f'{endpoint}-{timestamp}-{uuid.uuid4().hex[:8]}.folded'
+        self._write_file(filename, samples)
+        return filename
+
+    def _aggregate(self, samples):
+        """Merge a sampled request into its endpoint's profile"""
+        if not samples:
+            return
+        endpoint = request.endpoint or 'unknown'
+        max_stacks = self.app.config['PROFILE_MAX_STACKS']
+        now = time.monotonic()
+        with self._lock:
+            merged = self._aggregates.setdefault(endpoint, Counter())
+            for stack, count in samples.items():
+                if stack not in merged and len(merged) >= max_stacks:
+                    stack = OVERFLOW_STACK
+                merged[stack] += count
+            # Claim the flush while holding the lock so only one request writes
+            if now - self._last_flush.get(endpoint, 0.0) < self.app.config['PROFILE_FLUSH_INTERVAL']:
+                return
+            self._last_flush[endpoint] = now
+            snapshot = Counter(merged)
+        self._write_file(self._aggregate_filename(endpoint), snapshot)
+
+    def flush(self):
+        """Write every endpoint's merged profile to disk"""
+        now = time.monotonic()
+        with self._lock:
+            snapshots = {endpoint: Counter(merged) for endpoint, merged in self._aggregates.items()}
+            for endpoint in snapshots:
+                self._last_flush[endpoint] = now
+        for endpoint, samples in snapshots.items():
+            try:
+                self._write_file(self._aggregate_filename(endpoint), samples)
+            except Exception:
+                logger.exception('Failed to flush profile for %s', endpoint)
+
+    def _aggregate_filename(self, endpoint):
+        return f'sampled-{endpoint}-{os.getpid()}.folded'
+
+    def _write_file(self, filename, samples):
+        output_dir = self.app.config['PROFILE_OUTPUT_DIR']
+        os.makedirs(output_dir, exist_ok=True)
+        # A unique temp file per writer, renamed into place atomically
+        with tempfile.NamedTemporaryFile('w', dir=output_dir, prefix=f'.{filename}.',
+                                         suffix='.tmp', delete=False) as f:
+            f.write(_collapsed(samples))
+        os.replace(f.name, os.path.join(output_dir, filename))
+        self._prune(output_dir)
+
+    def _prune(self, output_dir):
+        """Keep only the newest PROFILE_MAX_FILES profiles"""
+        max_files = self.app.config['PROFILE_MAX_FILES']
+        with os.scandir(output_dir) as entries:
+            files = [entry for entry in entries if entry.is_file() and entry.name.endswith('.folded')]
+        if len(files) <= max_files:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in files[max_files:]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+request_profiler = RequestProfiler()